@@ -0,0 +1,53 @@
+import os
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.responses import FileResponse
+from pydantic import BaseModel, Field
+
+from core import FEATURE_ORDER, THRESHOLD, load_model, predict_batch, calibrate
+
+# =======================================================
+# 生产部署入口：静态 HTML 页面 + 单一推理接口
+# 用法: uvicorn api:app --workers 4
+# 每个 worker 进程只加载一份模型，不再像 Streamlit 那样每个用户会话都重跑整个脚本
+# =======================================================
+booster, _ = load_model()
+if booster is None:
+    raise RuntimeError("❌ Model missing. Please check file path.")
+
+app = FastAPI(title="AECOPD Risk Calculator")
+
+INDEX_HTML = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "index.html")
+
+
+class Features(BaseModel):
+    # 取值范围与 core.collect_inputs() 中的输入框保持一致
+    Mg: float = Field(ge=0.0, le=5.0)
+    ALT: float = Field(ge=0.0, le=500.0)
+    AG: float = Field(ge=0.0, le=50.0)
+    CHE: float = Field(ge=100.0, le=20000.0)
+    HCT: float = Field(ge=10.0, le=70.0)
+    INR: float = Field(ge=0.0, le=10.0)
+    hs_CRP: float = Field(ge=0.0, le=300.0)
+    Age: int = Field(ge=18, le=110)
+
+    def to_array(self):
+        # 按 FEATURE_ORDER 排列的 1x8 float32 数组
+        return np.array([[getattr(self, k) for k in FEATURE_ORDER]], dtype=np.float32)
+
+
+@app.get("/")
+def index():
+    return FileResponse(INDEX_HTML)
+
+
+@app.post("/predict")
+def predict(x: Features) -> dict:
+    raw_prob = float(predict_batch(x.to_array())[0])
+    return {
+        "raw": raw_prob,
+        "score": calibrate(raw_prob),
+        "high_risk": raw_prob > THRESHOLD,
+        "threshold": THRESHOLD,
+    }
@@ -1,7 +1,6 @@
 import streamlit as st
-import pandas as pd
-import pickle
-import os
+
+from core import THRESHOLD, load_model, collect_inputs, predict_proba_cached, calibrate
 
 # =======================================================
 # 1. 页面基础设置 (Page Config)
@@ -13,39 +12,21 @@ st.set_page_config(
 )
 
 # 🎨【关键修改】注入 CSS 样式，强制减少顶部留白，让截图更紧凑好看
-st.markdown("""
-    <style>
-        .block-container {
-            padding-top: 2rem;
-            padding-bottom: 0rem;
-            padding-left: 2rem;
-            padding-right: 2rem;
-        }
-        h1 {
-            font-size: 2.2rem !important;
-            margin-bottom: 0rem !important;
-        }
-        .stAlert {
-            padding-top: 0.5rem;
-            padding-bottom: 0.5rem;
-        }
-    </style>
-""", unsafe_allow_html=True)
+# 主题与 h1 字号已移到 .streamlit/config.toml；剩下主题无法表达的规则压缩成一行，
+# Streamlit 每次重跑都会重建页面，这段 <style> 仍需每次下发，只是体积更小
+COMPACT_CSS = (
+    "<style>"
+    ".block-container{padding:2rem 2rem 0}"
+    "h1{margin-bottom:0!important}"
+    ".stAlert{padding-top:.5rem;padding-bottom:.5rem}"
+    "</style>"
+)
+st.markdown(COMPACT_CSS, unsafe_allow_html=True)
 
 # =======================================================
 # 2. 加载模型 (Load Model)
 # =======================================================
-model_files = ["xgb_model.pkl", "xgb_model.pkl"] 
-loaded_model = None
-for file in model_files:
-    if os.path.exists(file):
-        try:
-            with open(file, "rb") as f:
-                loaded_model = pickle.load(f)
-            if isinstance(loaded_model, list): loaded_model = loaded_model[0]
-            break
-        except: pass
-
+loaded_model, _ = load_model()
 if loaded_model is None:
     st.error("❌ Model missing. Please check file path.")
     st.stop()
@@ -57,26 +38,10 @@ with st.sidebar:
     st.header("📋 Patient Parameters")
     st.markdown("---")
     
-    # 使用紧凑的输入框
-    Age = st.number_input("Age (years)", 18, 110, 75)
-    
-    c1, c2 = st.columns(2)
-    with c1:
-        CHE = st.number_input("CHE (U/L)", 100.0, 20000.0, 5000.0)
-        HCT = st.number_input("HCT (%)", 10.0, 70.0, 40.0)
-        AG = st.number_input("AG (mmol/L)", 0.0, 50.0, 12.0)
-        ALT = st.number_input("ALT (U/L)", 0.0, 500.0, 25.0)
-    with c2:
-        hs_CRP = st.number_input("hs-CRP (mg/L)", 0.0, 300.0, 10.0)
-        Mg = st.number_input("Mg (mmol/L)", 0.0, 5.0, 0.85)
-        INR = st.number_input("INR", 0.0, 10.0, 1.1)
-        # 占位符，保持对齐
-        st.write("") 
-
-    input_df = pd.DataFrame({
-        'Mg': Mg, 'ALT': ALT, 'AG': AG, 'CHE': CHE, 
-        'HCT': HCT, 'INR': INR, 'hs_CRP': hs_CRP, 'Age': Age
-    }, index=[0])
+    # 放进表单：修改输入不触发重跑，点击提交后才统一运行一次
+    with st.form("patient", border=False):
+        input_row = collect_inputs()
+        submitted = st.form_submit_button("🚀 Run Risk Assessment", type="primary", use_container_width=True)
     
     st.markdown("---")
     st.caption("© 2026 AECOPD Research Group")
@@ -93,20 +58,15 @@ with c_title:
     st.title("Hypoalbuminemia Risk Prediction")
     st.markdown("**Target Population:** Elderly Patients with AECOPD")
 
-# 按钮区 (美化按钮)
 st.markdown("") # 加一点点间距
-if st.button("🚀 Run Risk Assessment", type="primary", use_container_width=True):
+if submitted:
     
     # --- 预测逻辑 ---
-    prediction_proba = loaded_model.predict_proba(input_df)
-    raw_prob = float(prediction_proba[0][1])
-    threshold = 0.3396 
+    # 同一会话内输入未变时直接复用上次结果
+    raw_prob = predict_proba_cached(input_row)
     
     # 归一化逻辑
-    if raw_prob < threshold:
-        display_prob = (raw_prob / threshold) * 0.5
-    else:
-        display_prob = 0.5 + ((raw_prob - threshold) / (1 - threshold)) * 0.5
+    display_prob = calibrate(raw_prob)
 
     # --- 结果展示区 (卡片式设计) ---
     st.markdown("### 📊 Assessment Result")
@@ -122,7 +82,7 @@ if st.button("🚀 Run Risk Assessment", type="primary", use_container_width=Tru
             st.metric(
                 label="Raw Probability (Model)", 
                 value=f"{raw_prob:.2%}",
-                delta="> 33.96% Threshold" if raw_prob > threshold else None,
+                delta="> 33.96% Threshold" if raw_prob > THRESHOLD else None,
                 delta_color="inverse",
                 help="Direct output from the XGBoost model."
             )
@@ -135,14 +95,19 @@ if st.button("🚀 Run Risk Assessment", type="primary", use_container_width=Tru
                 help="Calibrated score. >50% indicates High Risk."
             )
         
-        # 进度条
-        st.progress(display_prob)
+        # 进度条 (静态 HTML，不触发前端的 st.progress 动画)
+        st.markdown(
+            f'<div style="background:#f0f2f6;border-radius:4px;height:8px">'
+            f'<div style="width:{display_prob * 100:.1f}%;background:#f63366;height:8px;border-radius:4px"></div>'
+            f'</div>',
+            unsafe_allow_html=True
+        )
         
         # 分割线
         st.markdown("---")
         
-        # 最终判定 (醒目的提示框)
-        if display_prob > 0.5:
+        # 最终判定 (醒目的提示框)，直接用原始概率与阈值比较
+        if raw_prob > THRESHOLD:
             st.error(
                 "#### ⚠️ High Risk Detected\n"
                 "The patient shows a high probability of hypoalbuminemia.\n\n"
@@ -156,7 +121,7 @@ if st.button("🚀 Run Risk Assessment", type="primary", use_container_width=Tru
             )
 
         # 底部小字
-        st.caption(f"Technical Note: Risk Score >50% aligns with Raw Probability > {threshold} (Youden Index).")
+        st.caption(f"Technical Note: Risk Score >50% aligns with Raw Probability > {THRESHOLD} (Youden Index).")
 
 else:
     # 默认状态下的占位提示 (为了让页面不显得空)
@@ -0,0 +1,214 @@
+import streamlit as st
+from collections import OrderedDict
+import numpy as np
+import xgboost as xgb
+import json
+import os
+import warnings
+
+# =======================================================
+# 共享核心：模型加载、特征采集、分数校准
+# app.py 只负责页面布局，缓存的模型在整个进程中只存在一份
+# =======================================================
+
+# 模型训练时的特征顺序，输入行必须按此顺序排列
+FEATURE_ORDER = ('Mg', 'ALT', 'AG', 'CHE', 'HCT', 'INR', 'hs_CRP', 'Age')
+
+# Youden 指数确定的分类阈值：原始概率高于此值即判为高风险
+THRESHOLD = 0.3396
+
+# 为 True 时允许走 FIL / 预编译库，或取 Booster 的 margin 再用 np.exp 做 sigmoid；
+# 需要与 SHAP 等工具逐位对齐 predict() 概率时关闭：一律直接返回 Booster 自身的概率输出
+USE_MARGIN_SIGMOID = True
+
+# =======================================================
+# 1. 加载模型 (Load Model)
+# =======================================================
+# 模型文件与本模块放在同一目录；按模块位置解析，不依赖启动时的工作目录
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 只加载 XGBoost 原生 UBJ 格式：C++ 直接解析，无需 pickle，也无需导入 sklearn/scipy
+# xgb_model.ubj 由 export_model.py 从 xgb_model.pkl 离线导出
+MODEL_PATHS = (os.path.join(BASE_DIR, "xgb_model.ubj"),)
+
+@st.cache_resource(ttl=None, max_entries=1)
+def load_model():
+    # 每个进程只加载一次，所有会话与重跑共享同一个 Booster
+    # 用 cache_resource 按引用保存，不对返回值做哈希/序列化 (Booster 本身也无法被 cache_data pickle)；
+    # 无参数 + max_entries=1 + 永不过期，保证进程内只有一个实例
+    for path in MODEL_PATHS:
+        if not os.path.exists(path):
+            continue
+        booster = xgb.Booster(model_file=path)
+        if booster.num_features() != len(FEATURE_ORDER):
+            raise ValueError(
+                f"{path} expects {booster.num_features()} features, "
+                f"but the app provides {len(FEATURE_ORDER)}."
+            )
+        # 启动时先做一次空预测预热，把首次预测的初始化开销挪出用户的第一次点击
+        booster.inplace_predict(np.zeros((1, len(FEATURE_ORDER)), dtype=np.float32))
+        objective = json.loads(booster.save_config())["learner"]["objective"]["name"]
+        return booster, objective
+    return None, None
+
+# FIL 按此批大小调优 layout/chunk size；部署批量模式时改成典型批大小
+FIL_BATCH_SIZE = 1
+
+@st.cache_resource(ttl=None, max_entries=1)
+def load_fil_model():
+    # 可选加速：若环境装有 cuML，则用 FIL 把森林编译成紧凑的推理结构 (只编译一次)
+    # 固定在 CPU 上加载与预测：单行预测走 GPU 要付主机↔显存拷贝与 kernel 启动开销，反而更慢
+    # 未安装时返回 None，继续使用 XGBoost Booster 预测
+    booster, objective = load_model()
+    if booster is None:
+        return None
+    try:
+        import cuml
+        from cuml import ForestInference
+    except ImportError:
+        return None
+    # binary:logitraw 没有概率输出：按回归模型加载，predict() 直接给出 margin，预测时再做 sigmoid
+    with cuml.using_device_type("cpu"):
+        fil_model = ForestInference.load(
+            MODEL_PATHS[0],
+            is_classifier=objective != "binary:logitraw",
+            model_type="xgboost_ubj",
+        )
+        fil_model.optimize(batch_size=FIL_BATCH_SIZE)
+        fil_model.predict(np.zeros((1, len(FEATURE_ORDER)), dtype=np.float32))
+    return fil_model
+
+# 由 export_model.py 在部署机器上用 Treelite/tl2cgen 预编译的森林共享库
+COMPILED_MODEL_PATH = os.path.join(BASE_DIR, "xgb_model.so")
+
+# 校验预编译库用的固定探针行：在各输入框取值范围内均匀采样 (列按 FEATURE_ORDER)
+PROBE_LOW = np.array([0.0, 0.0, 0.0, 100.0, 10.0, 0.0, 0.0, 18.0], dtype=np.float32)
+PROBE_HIGH = np.array([5.0, 500.0, 50.0, 20000.0, 70.0, 10.0, 300.0, 110.0], dtype=np.float32)
+PROBE_ROWS = (PROBE_LOW + np.random.default_rng(0).random((64, len(FEATURE_ORDER))) * (PROBE_HIGH - PROBE_LOW)).astype(np.float32)
+
+@st.cache_resource(ttl=None, max_entries=1)
+def load_compiled_model():
+    # 可选加速：存在预编译的 xgb_model.so 且装有 tl2cgen 时加载 (只加载一次)
+    # 森林已展开成直线 C 代码，单行预测只需几微秒；否则返回 None
+    if not os.path.exists(COMPILED_MODEL_PATH):
+        return None
+    try:
+        import tl2cgen
+    except ImportError:
+        return None
+    # 单行预测为主，开线程池的开销比预测本身还大
+    predictor = tl2cgen.Predictor(COMPILED_MODEL_PATH, nthread=1)
+    # .so 只是可选加速，任何不一致都只告警并回退，不能让整个应用报错
+    if predictor.num_feature != len(FEATURE_ORDER):
+        warnings.warn(
+            f"{COMPILED_MODEL_PATH} expects {predictor.num_feature} features, "
+            f"but the app provides {len(FEATURE_ORDER)}; ignoring it. "
+            "Re-run export_model.py to rebuild."
+        )
+        return None
+    # .so 不入库，可能是旧模型编译的：与当前 xgb_model.ubj 的 Booster 逐行比对 margin，
+    # 不一致就弃用并告警，绝不用过期的森林给患者打分 (同时完成预热)
+    booster, _ = load_model()
+    if booster is None:
+        return None
+    compiled_margin = predictor.predict(tl2cgen.DMatrix(PROBE_ROWS), pred_margin=True)[:, 0, 0]
+    booster_margin = booster.inplace_predict(PROBE_ROWS, predict_type="margin")
+    if not np.allclose(compiled_margin, booster_margin, rtol=1e-4, atol=1e-5):
+        warnings.warn(
+            f"{COMPILED_MODEL_PATH} does not match {MODEL_PATHS[0]} (stale build?); "
+            "ignoring it. Re-run export_model.py to rebuild."
+        )
+        return None
+    return predictor
+
+def predict_batch(arr):
+    # arr 为 (N, 8) 数组，列按 FEATURE_ORDER 排列；返回长度 N 的阳性类概率
+    # 单行与批量 (如日后的 CSV 上传) 共用同一路径，N 行只跨一次 Python/C 边界
+    # 统一为 C 连续的 float32 (已是则零拷贝)，XGBoost/FIL 内部不再做 float64→float32 转换
+    arr = np.ascontiguousarray(arr, dtype=np.float32)
+    booster, objective = load_model()
+    # 关闭 USE_MARGIN_SIGMOID 时跳过 FIL 与预编译库，保证与 predict()/SHAP 逐位一致
+    if not USE_MARGIN_SIGMOID:
+        out = booster.inplace_predict(arr)
+        # binary:logitraw 本身只输出 margin，仍需手动做 sigmoid
+        return 1.0 / (1.0 + np.exp(-out)) if objective == "binary:logitraw" else out
+    fil_model = load_fil_model()
+    if fil_model is not None:
+        import cuml
+        with cuml.using_device_type("cpu"):
+            if objective == "binary:logitraw":
+                # 与 Booster / 预编译库一致：取 margin 再做 sigmoid
+                margin = np.asarray(fil_model.predict(arr), dtype=np.float32).reshape(-1)
+                return 1.0 / (1.0 + np.exp(-margin))
+            return np.asarray(fil_model.predict_proba(arr))[:, 1]
+    compiled_model = load_compiled_model()
+    if compiled_model is not None:
+        import tl2cgen
+        # 取 margin 再做 sigmoid，与模型目标是 logistic 还是 logitraw 无关
+        margin = compiled_model.predict(tl2cgen.DMatrix(arr), pred_margin=True)[:, 0, 0]
+        return 1.0 / (1.0 + np.exp(-margin))
+    margin = booster.inplace_predict(arr, predict_type="margin")
+    return 1.0 / (1.0 + np.exp(-margin))
+
+def predict_proba(input_row):
+    # 单个患者：接受长度 8 的向量或 1x8 数组，返回阳性类概率
+    return float(predict_batch(np.atleast_2d(input_row))[0])
+
+@st.cache_data(max_entries=1024, ttl=3600, show_spinner=False)
+def predict_proba_shared(features):
+    # 跨会话共享的结果缓存：只以特征元组为键，模型通过 cache_resource 获取，不参与哈希
+    return predict_proba(np.asarray(features, dtype=np.float32).reshape(1, len(FEATURE_ORDER)))
+
+# 每个会话最多保留的预测结果条数 (LRU)，限制单会话内存
+SESSION_CACHE_SIZE = 64
+
+def predict_proba_cached(input_row):
+    # 以输入元组为键缓存在 st.session_state 中，无关控件触发的重跑不再重新遍历整片森林
+    key = tuple(input_row[0].tolist())
+    cache = st.session_state.setdefault("_pred_cache", OrderedDict())
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+    # 本会话未命中时，再查同一服务器上其他会话算过的结果
+    raw_prob = cache[key] = predict_proba_shared(key)
+    if len(cache) > SESSION_CACHE_SIZE:
+        cache.popitem(last=False)
+    return raw_prob
+
+# =======================================================
+# 2. 特征采集 (Inputs)
+# =======================================================
+def collect_inputs():
+    # 在当前容器 (如 st.sidebar) 中渲染输入框，返回按 FEATURE_ORDER 排列的 1x8 float32 数组
+    # 使用紧凑的输入框
+    Age = st.number_input("Age (years)", 18, 110, 75)
+
+    c1, c2 = st.columns(2)
+    with c1:
+        CHE = st.number_input("CHE (U/L)", 100.0, 20000.0, 5000.0)
+        HCT = st.number_input("HCT (%)", 10.0, 70.0, 40.0)
+        AG = st.number_input("AG (mmol/L)", 0.0, 50.0, 12.0)
+        ALT = st.number_input("ALT (U/L)", 0.0, 500.0, 25.0)
+    with c2:
+        hs_CRP = st.number_input("hs-CRP (mg/L)", 0.0, 300.0, 10.0)
+        Mg = st.number_input("Mg (mmol/L)", 0.0, 5.0, 0.85)
+        INR = st.number_input("INR", 0.0, 10.0, 1.1)
+        # 占位符，保持对齐
+        st.write("")
+
+    # 直接构造 1x8 float32 数组，省去 DataFrame 构建与 DMatrix 转换
+    features = {
+        'Mg': Mg, 'ALT': ALT, 'AG': AG, 'CHE': CHE,
+        'HCT': HCT, 'INR': INR, 'hs_CRP': hs_CRP, 'Age': Age
+    }
+    return np.array([[features[k] for k in FEATURE_ORDER]], dtype=np.float32)
+
+# =======================================================
+# 3. 分数校准 (Calibration)
+# =======================================================
+def calibrate(p, thr=THRESHOLD):
+    # 分段线性归一化：阈值映射到 50%，两侧各自线性拉伸到 [0, 0.5] / [0.5, 1]
+    # 直接按公式计算而非查表：页面显示的临床评分必须与说明中的公式逐位一致
+    if p < thr:
+        return (p / thr) * 0.5
+    return 0.5 + ((p - thr) / (1 - thr)) * 0.5
@@ -0,0 +1,41 @@
+import os
+import pickle
+
+# =======================================================
+# 离线导出：把 pickle 中的 XGBClassifier 转成 XGBoost 原生 UBJ 格式
+# 用法: python export_model.py  (生成 xgb_model.ubj，随仓库一起部署)
+# 反序列化 pickle 需要 scikit-learn，仅本脚本需要；线上 app 只读 UBJ，不依赖 sklearn
+# 若装有 treelite + tl2cgen，再把整片森林编译成 xgb_model.so (阈值与特征下标内联为常量)；
+# .so 与 CPU 架构绑定，需在部署机器上执行本脚本生成，不入库
+# =======================================================
+# 与 core.py 一致，按脚本所在目录读写模型文件
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+with open(os.path.join(BASE_DIR, "xgb_model.pkl"), "rb") as f:
+    model = pickle.load(f)
+if isinstance(model, list): model = model[0]
+
+booster = model.get_booster()
+booster.save_model(os.path.join(BASE_DIR, "xgb_model.ubj"))
+print("✅ Saved xgb_model.ubj")
+
+try:
+    import treelite
+    import tl2cgen
+except ImportError:
+    # 删除旧的 .so，避免留下与新 UBJ 不一致的编译库
+    so_path = os.path.join(BASE_DIR, "xgb_model.so")
+    if os.path.exists(so_path):
+        os.remove(so_path)
+        print("🗑️ Removed stale xgb_model.so")
+    print("ℹ️ treelite/tl2cgen not installed, skipping xgb_model.so")
+else:
+    # 不加 -ffast-math：缺失值 (NaN) 的分支走向依赖严格的浮点比较语义
+    tl2cgen.export_lib(
+        treelite.frontend.from_xgboost(booster),
+        toolchain="gcc",
+        libpath=os.path.join(BASE_DIR, "xgb_model.so"),
+        params={"parallel_comp": 8},
+        options=["-O3", "-march=native"],
+    )
+    print("✅ Saved xgb_model.so")